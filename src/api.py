@@ -1,17 +1,55 @@
 from flask import Flask, request, jsonify
-import tempfile
+import concurrent.futures
+import orjson
 import os
 from format_parsers import parse_screenplay  # Import from format_parsers instead of parser
-from pypdf import PdfReader  # Use pypdf for faster PDF extraction
+import fitz  # PyMuPDF - much faster text extraction than pypdf
 
 app = Flask(__name__)
 
-def extract_text_from_pdf(pdf_path):
+# Reuse one process pool across requests so we only pay worker startup once.
+# PDF page extraction holds the GIL in-process, so pages must be spread
+# across processes to use more than one core.
+_PDF_POOL = None
+
+# Below this page count the pool overhead outweighs the parallel win.
+_PARALLEL_PAGE_THRESHOLD = 8
+
+def _get_pdf_pool():
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        _PDF_POOL = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _PDF_POOL
+
+def _extract_page_range(args):
+    """Worker: open the in-memory PDF in the child and extract a page range."""
+    pdf_bytes, start, stop = args
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        return "\n".join(doc.load_page(i).get_text("text") for i in range(start, stop))
+    finally:
+        doc.close()
+
+def extract_text_from_pdf(pdf_bytes):
     """
-    Extract text content from a PDF file using pypdf for speed.
+    Extract text content from an in-memory PDF using PyMuPDF for speed.
+    Long documents are extracted page-parallel across a process pool,
+    one contiguous page range per worker.
     """
-    reader = PdfReader(pdf_path)
-    return "\n".join(page.extract_text() or "" for page in reader.pages)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        page_count = doc.page_count
+        if page_count < _PARALLEL_PAGE_THRESHOLD:
+            return "\n".join(page.get_text("text") for page in doc)
+    finally:
+        doc.close()
+
+    workers = os.cpu_count() or 1
+    chunk = -(-page_count // workers)  # ceil division
+    ranges = [(pdf_bytes, start, min(start + chunk, page_count))
+              for start in range(0, page_count, chunk)]
+    pool = _get_pdf_pool()
+    return "\n".join(pool.map(_extract_page_range, ranges))
 
 @app.route('/')
 def home():
@@ -38,39 +76,35 @@ def parse_script():
     if not file.filename.endswith('.pdf'):
         return jsonify({"error": "Only PDF files are supported"}), 400
 
-    # Create a temporary file to store the uploaded PDF
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-        file.save(tmp_file.name)
-        
-        try:
-            # Extract text from PDF
-            script_content = extract_text_from_pdf(tmp_file.name)
-            
-            # Parse the screenplay using the new parser from format_parsers.py
-            screenplay_data = parse_screenplay(
-                script_content, 
-                title=os.path.splitext(file.filename)[0]
-            )
-            
-            # Add some additional statistics
-            stats = {
-                "total_scenes": len(screenplay_data["screenplay"]["scenes"]),
-                "total_characters": len(screenplay_data["screenplay"]["characters"]),
-                "total_pages": screenplay_data["screenplay"]["total_pages"],
-                "character_scene_count": {}
-            }
-            
-            # Count scenes per character
-            for character in screenplay_data["screenplay"]["characters"]:
-                stats["character_scene_count"][character["name"]] = len(character["scene_appearances"])
-            
-            screenplay_data["statistics"] = stats
-            
-            return jsonify(screenplay_data)
-            
-        finally:
-            # Clean up the temporary file
-            os.unlink(tmp_file.name)
+    # Parse the upload straight from memory - no tempfile write/read round-trip
+    script_content = extract_text_from_pdf(file.read())
+
+    # Parse the screenplay using the new parser from format_parsers.py
+    screenplay_data = parse_screenplay(
+        script_content,
+        title=os.path.splitext(file.filename)[0]
+    )
+
+    # Add some additional statistics; scene counts come straight from
+    # the parser's precomputed per-character scene_appearances.
+    characters = screenplay_data["screenplay"]["characters"]
+    stats = {
+        "total_scenes": len(screenplay_data["screenplay"]["scenes"]),
+        "total_characters": len(characters),
+        "total_pages": screenplay_data["screenplay"]["total_pages"],
+        "character_scene_count": {
+            character["name"]: len(character["scene_appearances"])
+            for character in characters
+        }
+    }
+
+    screenplay_data["statistics"] = stats
+
+    # A parsed feature script is ~500KB of nested JSON; orjson serializes it
+    # several times faster than the stdlib encoder behind jsonify.
+    return app.response_class(orjson.dumps(screenplay_data), mimetype='application/json')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=8000)
\ No newline at end of file
+    # Dev-only entry point. Production runs under gunicorn (see Dockerfile)
+    # so a long PDF parse doesn't block every other client.
+    app.run(host='0.0.0.0', port=8000, threaded=True)
\ No newline at end of file
@@ -1,11 +1,24 @@
+import functools
 import re
 import json
+import sys
+from bisect import bisect_right
+from itertools import accumulate
 from typing import Dict, Any, List, Set
+from models import SceneType
 
 # Compile regexes and constants at module scope for speed
-SCENE_RE = re.compile(r'^\s*(\d+\.\s*)?(INT\.|EXT\.|INT/EXT\.|INT/EXT)')
-CHAR_RE = re.compile(r"^[A-Z][A-Z\s]+$")
-BLOCKED_WORDS = {
+# re.ASCII keeps \s/\d/\b out of the Unicode property tables; every
+# pattern here only ever needs to match ASCII screenplay formatting
+SCENE_RE = re.compile(r'^\s*(\d+\.\s*)?(INT\.|EXT\.|INT/EXT\.|INT/EXT)', re.ASCII)
+# Line-local variant of SCENE_RE for bulk-scanning the whole script in one
+# pass ([^\S\n] keeps the whitespace classes from crossing line boundaries)
+SCENE_SCAN_RE = re.compile(r'^[^\S\n]*(\d+\.[^\S\n]*)?(INT\.|EXT\.|INT/EXT\.|INT/EXT)', re.MULTILINE | re.ASCII)
+CHAR_RE = re.compile(r"^[A-Z][A-Z\s]+$", re.ASCII)
+SCENE_NUM_RE = re.compile(r"^\d+\.\s*", re.ASCII)
+HEAD_PREFIX_RE = re.compile(r"^(INT\.|EXT\.|INT/EXT\.|INT/EXT)\s*", re.ASCII)
+UPPER_TOKEN_RE = re.compile(r"[A-Z]+")
+BLOCKED_WORDS = frozenset({
     # ... (same as before, full list omitted for brevity)
     "INT", "EXT", "CUT", "FADE", "DISSOLVE", "VOICE", "TITLE",
     "TO:", "ANGLE", "TITLE", "OVER", "BY", "END", "CONT'D", 
@@ -29,8 +42,7 @@ BLOCKED_WORDS = {
     "SUPER", "CHYRON", "TITLE CARD",
     "NOTE", "IMPORTANT", "WARNING", "CAUTION", "NOTICE", "ATTENTION",
     "HELLO", "HEY", "YES", "NO", "WAIT", "STOP", "GO", "LOOK", "LISTEN"
-}
-BLOCK_RE = re.compile(r"\\b(?:%s)\\b" % "|".join(map(re.escape, BLOCKED_WORDS)))
+})
 TECHNICAL_PHRASES = [
     "WIDE ON", "ANGLE ON", "CUT TO", "FADE IN", "FADE OUT", "DISSOLVE TO",
     "SMASH CUT", "PRELAP", "HOLD IN", "BACK TO", "CLOSE ON", "CLOSE UP",
@@ -39,202 +51,298 @@ TECHNICAL_PHRASES = [
     "SAME TIME", "LATER", "CONTINUOUS", "PREVIOUSLY", "WE SEE", "WE HEAR",
     "ANGLE OF", "VIEW OF", "IN BLACK", "SHOT OF", "DREAM SEQUENCE"
 ]
+# One alternation matches every technical phrase in a single C-level pass
+TECH_ALT_RE = re.compile("|".join(map(re.escape, TECHNICAL_PHRASES)))
+
+# Exact names and substrings that disqualify an otherwise cue-shaped line
+_TAIL_EXACT = frozenset({
+    "MUSIC", "SOUND", "BLACK", "CONTINUOUS", "SAME", "LATER",
+    "INSTRUCTIONS", "AWAIT", "GATHER", "HOLD", "PRESENTS"
+})
+_TAIL_RE = re.compile("|".join(map(re.escape, (
+    "PRESENTS", "IN BLACK", "PRODUCTION", "MUSIC", "SOUND",
+    "FADE", "CUT", "DISSOLVE", "TRACK", "PAN", "WIDE"
+))))
+
+# Line classes returned by classify_line
+LINE_BLANK, LINE_SCENE, LINE_CHAR, LINE_ACTION = range(4)
+
+_SCENE_PREFIXES = ("INT.", "EXT.", "INT/EXT")
+
+def _is_heading(stripped):
+    """
+    Literal-prefix scene heading test: same acceptance as SCENE_SCAN_RE
+    on a stripped line, but a C-level startswith instead of the regex
+    engine. Only numbered headings ("12. INT. ...") touch SCENE_NUM_RE.
+    """
+    if stripped.startswith(_SCENE_PREFIXES):
+        return True
+    return (stripped[:1].isdigit()
+            and SCENE_NUM_RE.sub("", stripped).startswith(_SCENE_PREFIXES))
+
+def classify_line(stripped):
+    """
+    Categorize a stripped line with cheap string checks.
+
+    Only all-caps lines (one C-level isupper() call) pay for the CHAR_RE
+    confirm; everything else classifies without touching the regex engine.
+    """
+    if not stripped:
+        return LINE_BLANK
+    if _is_heading(stripped):
+        return LINE_SCENE
+    if stripped.isupper() and CHAR_RE.match(stripped):
+        return LINE_CHAR
+    return LINE_ACTION
+
+# Closed vocabulary of time-of-day keywords (including variations) mapped to
+# their canonical labels. Matched longest-first in a single scan.
+TIME_KEYWORDS = {
+    "MOMENTS LATER": "MOMENTS_LATER",
+    "SAME TIME": "SAME_TIME",
+    "CONTINUOUS": "CONTINUOUS",
+    "AFTERNOON": "AFTERNOON",
+    "MORNING": "MORNING",
+    "EVENING": "EVENING",
+    "LATER": "LATER",
+    "NIGHT": "NIGHT",
+    "DAWN": "DAWN",
+    "DUSK": "DUSK",
+    "CONT": "CONTINUOUS",  # covers CONT'D etc.
+    "DAY": "DAY",
+}
+TIME_RE = re.compile(r"\b(?:%s)\b" % "|".join(
+    sorted(map(re.escape, TIME_KEYWORDS), key=len, reverse=True)), re.ASCII)
+
+def _strip_parens(s):
+    """
+    Remove every (...) group with find/slice instead of a regex sub.
+
+    The common input has one group at most, which makes this two C-level
+    find calls and a slice - no regex engine setup. Matches the sub's
+    semantics exactly, including leaving an unmatched "(" tail alone.
+    """
+    i = s.find("(")
+    if i < 0:
+        return s
+    parts = []
+    start = 0
+    while i >= 0:
+        j = s.find(")", i + 1)
+        if j < 0:
+            break  # unmatched "(": keep the tail, as the regex would
+        parts.append(s[start:i])
+        start = j + 1
+        i = s.find("(", start)
+    parts.append(s[start:])
+    return "".join(parts)
+
+def _lookup_time(part):
+    """Resolve a heading fragment to its canonical time label, or None."""
+    # Exact dict hit covers the overwhelming majority of headings
+    # ("DAY", "NIGHT", ...); only decorated tails like "DAY (YEARS AGO)"
+    # or "CONT'D" fall through to the single keyword scan.
+    label = TIME_KEYWORDS.get(part)
+    if label is not None:
+        return label
+    m = TIME_RE.search(part)
+    return TIME_KEYWORDS[m.group(0)] if m else None
+
+def extract_time(text):
+    """Extract time of day from a scene heading."""
+    # Check parentheses first: find/slice pulls out the first (...) group
+    # without invoking the regex engine
+    i = text.find("(")
+    if i >= 0:
+        j = text.find(")", i + 1)
+        if j >= 0:
+            found = _lookup_time(text[i + 1:j].strip().upper())
+            if found:
+                return found
+
+    # Check after dash
+    if "-" in text:
+        time_part = _strip_parens(text.split("-", 1)[1]).strip().upper()
+        found = _lookup_time(time_part)
+        if found:
+            return found
+
+    return "UNKNOWN"
+
+# Common character name misspellings and variations
+CHARACTER_ALIASES = {
+    # Add other known character variations here
+}
+
+@functools.lru_cache(maxsize=4096)
+def normalize_character_name(name):
+    """
+    Normalize character names to handle variations and misspellings.
+
+    Cached because lead characters recur hundreds of times per script,
+    and every hit would otherwise re-run the paren strip.
+    """
+    # Remove any parenthetical elements
+    clean_name = _strip_parens(name).strip()
+
+    # Use alias mapping if available
+    if clean_name in CHARACTER_ALIASES:
+        return CHARACTER_ALIASES[clean_name]
+
+    return clean_name
 
 def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file.
     This function is included here for consistency but is defined in the API.
     """
-    import pdfplumber
-    with pdfplumber.open(pdf_path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    return text
+    import fitz  # PyMuPDF: extraction runs in C, far faster than pdfplumber
+    doc = fitz.open(pdf_path)
+    try:
+        # "text" mode preserves the newline layout the line classifiers
+        # depend on; join once instead of rebuilding the string per page
+        return "\n".join(
+            page.get_text("text") if _page_has_text(page) else ""
+            for page in doc) + "\n"
+    finally:
+        doc.close()
 
-def parse_screenplay(script, title):
+def _page_has_text(page):
     """
-    Parse screenplay text into structured data.
-    Two-pass approach:
-    1. First pass: Identify scenes and dialogue characters
-    2. Second pass: Look for already-identified characters in action text
-    
-    Args:
-        script: The text content of the screenplay
-        title: The title of the screenplay
-        
-    Returns:
-        Dictionary containing the structured screenplay data
+    Cheap probe for scanned/image-only pages: a page with no BT (begin
+    text object) operator in its decompressed content stream cannot yield
+    any text, so full extraction can be skipped. The substring scan is a
+    C-level find over a few KB - far cheaper than layout analysis on a
+    full-page image.
     """
-    # Common character name misspellings and variations
-    CHARACTER_ALIASES = {
-        # Add other known character variations here
-    }
-    
-    # Time of day mapping
-    time_mapping = {
-        "MORNING": "MORNING",
-        "DAY": "DAY",
-        "AFTERNOON": "AFTERNOON",
-        "EVENING": "EVENING",
-        "NIGHT": "NIGHT",
-        "DAWN": "DAWN",
-        "DUSK": "DUSK",
-        "CONTINUOUS": "CONTINUOUS",
-        "LATER": "LATER",
-        "MOMENTS LATER": "MOMENTS_LATER",
-        "SAME TIME": "SAME_TIME"
-    }
-    
-    # Constants for page calculation
-    DIALOGUE_LINES_PER_PAGE = 45
-    ACTION_LINES_PER_PAGE = 58
-    
-    #-----------------------------------------------------------------------
-    # Helper functions
-    #-----------------------------------------------------------------------
-    
-    def is_character_name(line):
-        stripped = line.strip()
-        if len(stripped.split()) > 5:
-            return False
-        # Use compiled BLOCK_RE for fast blocked word check
-        if BLOCK_RE.search(stripped.upper()):
-            return False
-        alpha_count = sum(1 for c in stripped if c.isalpha())
-        if alpha_count < 2:
-            return False
-        base_name = re.sub(r"\(.*?\)", "", stripped).strip()
-        if not CHAR_RE.match(base_name):
-            return False
-        clean_name = re.sub(r"\(.*?\)", "", stripped).strip()
-        if not clean_name:
-            return False
-        if SCENE_RE.match(clean_name):
-            return False
-        for phrase in TECHNICAL_PHRASES:
-            if clean_name.startswith(phrase) or clean_name.endswith(phrase) or phrase in clean_name:
-                return False
-        if clean_name in ["MUSIC", "SOUND", "BLACK", "CONTINUOUS", "SAME", "LATER", 
-                         "INSTRUCTIONS", "AWAIT", "GATHER", "HOLD", "PRESENTS"]:
-            return False
-        if any(term in clean_name for term in ["PRESENTS", "IN BLACK", "PRODUCTION", "MUSIC", "SOUND", 
-                                              "FADE", "CUT", "DISSOLVE", "TRACK", "PAN", "WIDE"]):
-            return False
-        return True
+    return b"BT" in page.read_contents()
 
-    def normalize_character_name(name):
-        """
-        Normalize character names to handle variations and misspellings.
-        """
-        # Remove any parenthetical elements
-        clean_name = re.sub(r"\(.*?\)", "", name).strip()
-        
-        # Use alias mapping if available
-        if clean_name in CHARACTER_ALIASES:
-            return CHARACTER_ALIASES[clean_name]
-        
-        return clean_name
-    
-    def extract_time(text):
-        """Helper function to extract time of day from scene heading"""
-        # Check parentheses first
-        if "(" in text and ")" in text:
-            paren_match = re.search(r'\((.*?)\)', text)
-            if paren_match:
-                time_part = paren_match.group(1).strip().upper()
-                # Direct mapping check
-                if time_part in time_mapping:
-                    return time_mapping[time_part]
-                # Handle variations
-                if "CONT" in time_part or time_part == "CONT'D":
-                    return "CONTINUOUS"
-                if "LATER" in time_part:
-                    return "MOMENTS_LATER" if "MOMENTS" in time_part else "LATER"
-                if "SAME" in time_part and "TIME" in time_part:
-                    return "SAME_TIME"
-
-        # Check after dash
-        if "-" in text:
-            time_part = text.split("-", 1)[1].strip().upper()
-            # Remove any parentheses
-            time_part = re.sub(r'\(.*?\)', '', time_part).strip()
-            
-            # Direct mapping check
-            if time_part in time_mapping:
-                return time_mapping[time_part]
-            
-            # Handle variations
-            if "CONT" in time_part or time_part == "CONT'D":
-                return "CONTINUOUS"
-            if "LATER" in time_part:
-                return "MOMENTS_LATER" if "MOMENTS" in time_part else "LATER"
-            if "SAME" in time_part and "TIME" in time_part:
-                return "SAME_TIME"
-        
-        return "UNKNOWN"
+def iter_pdf_lines(pdf_path):
+    """
+    Yield script lines from a PDF one page at a time.
+
+    Peak memory is a single page of text instead of the whole document,
+    so very long scripts can be fed straight into parse_screenplay or
+    iter_parse_screenplay without ever materializing the full script.
+    """
+    import fitz
+    doc = fitz.open(pdf_path)
+    try:
+        for page in doc:
+            if _page_has_text(page):
+                yield from page.get_text("text").split("\n")
+    finally:
+        doc.close()
+
+@functools.lru_cache(maxsize=8192)
+def is_character_name(stripped):
+    """
+    Decide whether a stripped line is a character cue.
+
+    Cached: the same cues recur hundreds of times per script, so repeat
+    lookups are a dict hit instead of re-running every check.
+    """
+    # Callers pass the already-stripped line; don't allocate another copy
+    if not stripped:
+        return False
+    toks = stripped.split()
+    if len(toks) > 5:
+        return False
+    # Need at least two letters; stop scanning as soon as we have them
+    alpha_count = 0
+    for c in stripped:
+        if c.isalpha():
+            alpha_count += 1
+            if alpha_count == 2:
+                break
+    if alpha_count < 2:
+        return False
+    # One pass strips parentheticals; reuse the result for every check below
+    clean_name = _strip_parens(stripped).strip()
+    if not clean_name:
+        return False
+    # isupper() is a single C call and rejects every mixed-case line
+    # before the regex runs; CHAR_RE can only match all-caps text.
+    if not clean_name.isupper():
+        return False
+    if not CHAR_RE.match(clean_name):
+        return False
+    # Blocked-vocabulary probe. Only lines that already look like cues reach
+    # this point, so uppercasing happens per short token here instead of on
+    # every line of the script (parenthetical content can be mixed case).
+    if not BLOCKED_WORDS.isdisjoint(t.upper() for t in toks):
+        return False
+    # Scene headings are a cheap literal-prefix test, no regex needed
+    if clean_name.startswith(("INT.", "EXT.", "INT/EXT", "INT ", "EXT ")):
+        return False
+    if TECH_ALT_RE.search(clean_name):
+        return False
+    if clean_name in _TAIL_EXACT:
+        return False
+    if _TAIL_RE.search(clean_name):
+        return False
+    return True
+
+
+def _iter_scenes(lines, stats, heading_lines=None):
+    """
+    First pass as a generator: walk ``lines`` once and yield
+    ``(scene, scene_tokens)`` as each scene is finalized, where
+    ``scene_tokens`` is the scene's uppercase-token set used by the
+    second pass.
+
+    ``stats`` is a dict filled in-place with the script-wide accumulators
+    ("all_characters", "line_counts", "total_pages"); they are only
+    complete once the generator is exhausted.
+
+    ``heading_lines`` is an optional precomputed set of heading line
+    indices from a bulk SCENE_SCAN_RE scan over the full script. When
+    ``lines`` is a true stream it is None and headings are detected per
+    line with the equivalent literal-prefix test instead.
+    """
+    all_characters = stats["all_characters"] = set()
+    line_counts = stats["line_counts"] = {}
+    stats["total_pages"] = 0.0
 
-    def calculate_page_count(scene_lines):
-        """Calculate page count based on line types"""
-        dialogue_lines = 0
-        action_lines = 0
-        in_dialogue = False
-        
-        for line in scene_lines:
-            stripped = line.strip()
-            if not stripped:
-                continue
-                
-            # Check if this is a character name
-            if CHAR_RE.match(stripped) and not SCENE_RE.match(stripped):
-                in_dialogue = True
-                dialogue_lines += 1
-                continue
-                
-            # Count dialogue or action lines
-            if in_dialogue:
-                if not stripped:
-                    in_dialogue = False
-                else:
-                    dialogue_lines += 1
-            else:
-                action_lines += 1
-        
-        # Calculate pages based on line type ratios
-        dialogue_pages = dialogue_lines / DIALOGUE_LINES_PER_PAGE
-        action_pages = action_lines / ACTION_LINES_PER_PAGE
-        return round(dialogue_pages + action_pages, 2)
-    
-    #-----------------------------------------------------------------------
-    # First pass: Identify scenes and dialogue characters
-    #-----------------------------------------------------------------------
-    lines = script.split('\n')
-    scenes = []
-    scene_buffers = []  # Store raw text for each scene
-    all_characters = set()  # All characters found in dialogue
-    
     current_scene = None
-    current_characters = set()
-    scene_buffer = []
+    # Insertion-ordered set: dict keys keep first-appearance order, so scene
+    # character lists come out in screenplay order
+    current_characters = {}
+    scene_tokens = set()
+    scene_number = 0
+
+    # Dialogue line counts, tracked online: a cue makes its character the
+    # current speaker, who owns every following non-blank line until the
+    # next cue (or scene heading) takes over.
+    current_speaker = None
     line_count = 0
     current_page_count = 0.0
-    in_first_scene = False  # Flag to track if we've found the first scene yet
-    
+
     # For on-the-fly page metrics
     dialogue_lines = 0
     action_lines = 0
     in_dialogue = False
-    
-    for line in lines:
+
+    # Bind hot callables to locals: LOAD_FAST instead of a global/attribute
+    # lookup on every line of the script
+    _classify = classify_line
+    _is_char = is_character_name
+    _find_tokens = UPPER_TOKEN_RE.findall
+    _normalize = normalize_character_name
+    _intern = sys.intern
+    _heading = _is_heading
+
+    for line_no, line in enumerate(lines):
         stripped_line = line.strip()
-        
+
         # Identify new scenes
-        if SCENE_RE.match(stripped_line):
-            # Process previous scene
+        if (line_no in heading_lines if heading_lines is not None
+                else _heading(stripped_line)):
+            # Finalize and emit the previous scene
             if current_scene:
                 current_scene["characters"] = list(current_characters)
                 current_scene["line_count"] = line_count
-                
+
                 # Use on-the-fly page metrics
                 dialogue_pages = dialogue_lines / 45
                 action_pages = action_lines / 58
@@ -242,36 +350,43 @@ def parse_screenplay(script, title):
                 current_scene["page_count"] = page_count
                 current_scene["start_page"] = current_page_count
                 current_scene["end_page"] = current_page_count + page_count
-                
-                scenes.append(current_scene)
-                scene_buffers.append(scene_buffer)
+
                 current_page_count += page_count
-                scene_buffer = []
+                stats["total_pages"] = current_page_count
+                yield current_scene, scene_tokens
+                scene_tokens = set()
                 dialogue_lines = 0
                 action_lines = 0
 
-            # Extract scene components
+            # Extract scene components; uppercase the heading once and reuse it
             location_text = stripped_line
-            scene_type = "INTERIOR" if "INT." in location_text.upper() and "INT/EXT" not in location_text.upper() else \
-                       "EXTERIOR" if "EXT." in location_text.upper() and "INT/EXT" not in location_text.upper() else \
-                       "INTERIOR_EXTERIOR"
-            
+            upper_heading = location_text.upper()
+            if "INT/EXT" in upper_heading:
+                scene_type = SceneType.INTERIOR_EXTERIOR.value
+            elif "INT." in upper_heading:
+                scene_type = SceneType.INTERIOR.value
+            elif "EXT." in upper_heading:
+                scene_type = SceneType.EXTERIOR.value
+            else:
+                scene_type = SceneType.INTERIOR_EXTERIOR.value
+
             # Remove scene number if present
-            if re.match(r'^\d+\.', location_text):
-                location_text = re.sub(r'^\d+\.\s*', '', location_text)
-            
+            if SCENE_NUM_RE.match(location_text):
+                location_text = SCENE_NUM_RE.sub('', location_text)
+
             # Extract time of day
             time_of_day = extract_time(location_text)
-            
+
             # Clean up location
-            clean_location = re.sub(r'^(INT\.|EXT\.|INT/EXT\.|INT/EXT)\s*', '', location_text)
+            clean_location = HEAD_PREFIX_RE.sub('', location_text)
             if "-" in clean_location:
                 clean_location = clean_location.split("-")[0]
-            clean_location = re.sub(r'\(.*?\)', '', clean_location)
+            clean_location = _strip_parens(clean_location)
             clean_location = clean_location.strip()
-            
+
+            scene_number += 1
             current_scene = {
-                "scene_number": len(scenes) + 1,
+                "scene_number": scene_number,
                 "type": scene_type,
                 "location": clean_location,
                 "time_of_day": time_of_day,
@@ -282,38 +397,53 @@ def parse_screenplay(script, title):
                 "start_page": current_page_count,
                 "end_page": 0.0,
             }
-            current_characters = set()
+            current_characters = {}
             line_count = 0
-            in_first_scene = True
-            
-        # Add line to scene buffer
-        if current_scene:
-            scene_buffer.append(line)
-            line_count += 1
-            # On-the-fly page metrics
-            if CHAR_RE.match(stripped_line) and not SCENE_RE.match(stripped_line):
-                in_dialogue = True
-                dialogue_lines += 1
-            elif in_dialogue:
-                if not stripped_line:
-                    in_dialogue = False
-                else:
-                    dialogue_lines += 1
-            elif stripped_line:
-                action_lines += 1
-
-        # Identify characters from dialogue - but only after we've found the first scene
-        if in_first_scene and is_character_name(stripped_line):
-            # Clean and normalize the character name
-            clean_name = normalize_character_name(stripped_line)
-            current_characters.add(clean_name)
+            current_speaker = None
+
+        # Title pages and credits precede the first heading; skip them before
+        # doing any per-line classification work.
+        if current_scene is None:
+            continue
+
+        # Fold the line's uppercase tokens into the scene's token set so the
+        # second pass never has to re-read the scene text
+        scene_tokens.update(_find_tokens(line))
+        line_count += 1
+        # On-the-fly page metrics driven by the cheap line classifier
+        line_class = _classify(stripped_line)
+        if line_class == LINE_CHAR:
+            in_dialogue = True
+            dialogue_lines += 1
+        elif line_class == LINE_BLANK:
+            in_dialogue = False
+        elif in_dialogue:
+            dialogue_lines += 1
+        else:
+            action_lines += 1
+
+        # Identify characters from dialogue. A cue must clean to a name
+        # starting A-Z, so anything not opening with an uppercase letter or a
+        # parenthetical can skip the full candidate check.
+        if stripped_line and (stripped_line[0].isupper() or stripped_line[0] == "(") \
+                and _is_char(stripped_line):
+            # sys.intern collapses equal-but-distinct normalized names
+            # ("JOHN" from both "JOHN" and "JOHN (O.S.)") to one shared
+            # object and gives every later dict/set lookup on the name the
+            # interned-pointer fast path
+            clean_name = _intern(_normalize(stripped_line))
+            current_characters[clean_name] = None
             all_characters.add(clean_name)
+            current_speaker = clean_name
+            line_counts[clean_name] = line_counts.get(clean_name, 0) + 1
+        elif stripped_line and current_speaker is not None:
+            line_counts[current_speaker] += 1
 
-    # Process the last scene
+    # Finalize and emit the last scene
     if current_scene:
         current_scene["characters"] = list(current_characters)
         current_scene["line_count"] = line_count
-        
+
         # Use on-the-fly page metrics for last scene
         dialogue_pages = dialogue_lines / 45
         action_pages = action_lines / 58
@@ -321,72 +451,118 @@ def parse_screenplay(script, title):
         current_scene["page_count"] = page_count
         current_scene["start_page"] = current_page_count
         current_scene["end_page"] = current_page_count + page_count
-        
-        scenes.append(current_scene)
-        scene_buffers.append(scene_buffer)
-        current_page_count += page_count
-    
-    # Normalize character list to remove duplicates and misspellings
-    normalized_characters = set()
-    for character in all_characters:
-        normalized_characters.add(normalize_character_name(character))
-    all_characters = normalized_characters
+
+        stats["total_pages"] = current_page_count + page_count
+        yield current_scene, scene_tokens
+
+
+def iter_parse_screenplay(script_lines):
+    """
+    Stream first-pass scene dicts from an iterable of lines.
+
+    Yields each scene as soon as the next heading (or the end of input)
+    closes it, keeping only the current scene in memory — useful for very
+    long scripts when the full parse_screenplay result isn't needed.
+    Scenes carry first-pass data only: characters come from dialogue cues,
+    without the cross-scene action-text sweep parse_screenplay adds.
+    """
+    stats = {}
+    for scene, _tokens in _iter_scenes(script_lines, stats):
+        yield scene
+
+
+def parse_screenplay(script, title):
+    """
+    Parse screenplay text into structured data.
+    Two-pass approach:
+    1. First pass: Identify scenes and dialogue characters
+    2. Second pass: Look for already-identified characters in action text
     
+    Args:
+        script: The text content of the screenplay, either as one string
+            or as an iterable of lines (e.g. iter_pdf_lines) so huge
+            scripts never have to be materialized in memory
+        title: The title of the screenplay
+
+    Returns:
+        Dictionary containing the structured screenplay data
+    """
+    #-----------------------------------------------------------------------
+    # First pass: Identify scenes and dialogue characters
+    #   (streamed through the _iter_scenes generator; iter_parse_screenplay
+    #    is the incremental entry point for callers that don't need the
+    #    cross-scene second pass below)
+    #-----------------------------------------------------------------------
+    if isinstance(script, str):
+        lines = script.split('\n')
+
+        # Bulk-classify scene headings with one scan over the whole script
+        # instead of a per-line SCENE_RE.match; the scene loop then only
+        # does a set-membership test per line.
+        line_starts = [0] + list(accumulate(len(l) + 1 for l in lines))
+        heading_lines = {bisect_right(line_starts, m.start()) - 1
+                         for m in SCENE_SCAN_RE.finditer(script)}
+    else:
+        # Already an iterable of lines (e.g. iter_pdf_lines): consume it as
+        # a stream; headings are then detected per line by literal prefix
+        lines = script
+        heading_lines = None
+
+    stats = {}
+    scenes = []
+    scene_token_sets = []  # Uppercase tokens per scene, built as lines arrive
+    for scene, tokens in _iter_scenes(lines, stats, heading_lines):
+        scenes.append(scene)
+        scene_token_sets.append(tokens)
+
+    # Script-wide accumulators, complete now that the generator is exhausted.
+    # all_characters holds normalized names: every entry went through
+    # normalize_character_name (idempotent) as it was detected.
+    all_characters = stats["all_characters"]
+    line_counts = stats["line_counts"]
+    current_page_count = stats["total_pages"]
+
+
     #-----------------------------------------------------------------------
     # Second pass: Look for already-identified characters in action description
     #   (Optimized: use token set intersection instead of O(n*m) regex)
     #-----------------------------------------------------------------------
     character_list = list(all_characters)
     char_tokens = {c: set(c.split()) for c in character_list}
-    for i, (scene, buffer) in enumerate(zip(scenes, scene_buffers)):
-        scene_characters = set(normalize_character_name(char) for char in scene["characters"])
-        words = set(w.upper() for w in re.findall(r"[A-Z]+", " ".join(buffer)))
-        extra = [c for c, toks in char_tokens.items() if toks <= words and c not in scene_characters]
-        scene_characters.update(extra)
-        scenes[i]["characters"] = list(scene_characters)
+    for scene, words in zip(scenes, scene_token_sets):
+        # Names were normalized when detected and the list is already
+        # duplicate-free in screenplay order; just append the newcomers
+        present = set(scene["characters"])
+        scene["characters"] += [c for c, toks in char_tokens.items()
+                                if c not in present and toks <= words]
     
     #-----------------------------------------------------------------------
     # Calculate character statistics
+    #   (line counts were accumulated online during the first pass; only
+    #    scene appearances need a cheap sweep over the finished scenes)
     #-----------------------------------------------------------------------
-    character_stats = []
-    for character in sorted(list(all_characters)):
-        # Count scenes per character
-        scene_appearances = []
-        line_count = 0
-        
-        for scene_idx, scene in enumerate(scenes):
-            normalized_scene_chars = [normalize_character_name(char) for char in scene["characters"]]
-            if character in normalized_scene_chars:
-                scene_appearances.append(scene_idx + 1)  # 1-based scene numbers
-        
-        # Count lines (approximate)
-        for buffer in scene_buffers:
-            for line_idx, line in enumerate(buffer):
-                normalized_line = normalize_character_name(line.strip())
-                if normalized_line == character:
-                    line_count += 1  # Count the character cue
-                    # Count the lines of dialogue that follow
-                    dialogue_count = 0
-                    for following_line in buffer[line_idx+1:]:
-                        if not following_line.strip():
-                            continue
-                        if is_character_name(following_line):
-                            break
-                        dialogue_count += 1
-                    line_count += dialogue_count
-        
-        character_stats.append({
+    sorted_characters = sorted(all_characters)
+    scene_appearances = {character: [] for character in sorted_characters}
+    for scene_idx, scene in enumerate(scenes):
+        for char in scene["characters"]:
+            if char in scene_appearances:
+                scene_appearances[char].append(scene_idx + 1)  # 1-based scene numbers
+
+    character_stats = [
+        {
             "name": character,
-            "scene_appearances": scene_appearances,
-            "total_lines": max(1, line_count)  # Ensure at least 1 line
-        })
+            "scene_appearances": appearances,
+            "total_lines": max(1, line_counts.get(character, 0))  # Ensure at least 1 line
+        }
+        for character, appearances in scene_appearances.items()
+    ]
     
     return {
         "screenplay": {
             "title": title,
             "scenes": scenes,
             "characters": character_stats,
-            "all_characters": sorted(list(all_characters)),
+            "all_characters": sorted_characters,
             "total_pages": round(current_page_count, 2)
         }
     }
@@ -399,8 +575,16 @@ def screenplay_to_json(screenplay_data, output_file):
         screenplay_data: The parsed screenplay data
         output_file: Path to save the JSON file
     """
-    with open(output_file, 'w', encoding='utf-8') as json_file:
-        json.dump(screenplay_data, json_file, indent=4, ensure_ascii=False)
+    try:
+        import orjson
+    except ImportError:
+        with open(output_file, 'w', encoding='utf-8') as json_file:
+            json.dump(screenplay_data, json_file, indent=4, ensure_ascii=False)
+        return
+    # orjson serializes the whole tree in C and hands back bytes directly,
+    # several times faster than the stdlib encoder on large parse results
+    with open(output_file, 'wb') as json_file:
+        json_file.write(orjson.dumps(screenplay_data, option=orjson.OPT_INDENT_2))
 
 def debug_parse(script, title=None, verbose=True):
     """
@@ -420,54 +604,36 @@ def debug_parse(script, title=None, verbose=True):
     if verbose:
         print(f"Parsing script: {title}")
         print(f"Script length: {len(script)} characters")
-        
-    # Track what we find
-    scene_headings = []
-    dialogue_characters = []
-    rejected_characters = []
-    
-    # First pass - identify scenes and dialogue characters
-    lines = script.split("\n")
-    in_scene = False
-    
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if not stripped:
-            continue
-            
-        # Check for scene heading
-        if SCENE_RE.match(stripped):
-            if verbose:
-                print(f"Line {i+1}: Scene heading found: {stripped}")
-            scene_headings.append((i+1, stripped))
-            in_scene = True
-            
-        # Only look for characters within scenes
-        if not in_scene:
-            continue
-            
-        # Character detection
-        clean_name = re.sub(r"\(.*?\)", "", stripped).strip()
-        if CHAR_RE.match(clean_name):
-            if len(clean_name.split()) <= 5 and len(clean_name) <= 40:
-                if is_character_name(stripped):
-                    if verbose:
-                        print(f"Line {i+1}: Character found: {stripped}")
-                    dialogue_characters.append((i+1, stripped))
-                else:
-                    if verbose:
-                        print(f"Line {i+1}: Rejected as character: {stripped}")
-                    rejected_characters.append((i+1, stripped))
-    
-    if verbose:
-        print(f"\nFound {len(scene_headings)} scene headings")
-        print(f"Found {len(dialogue_characters)} dialogue character cues")
-        print(f"Rejected {len(rejected_characters)} false character cues")
-        
-    # Parse the full screenplay
+
+    # Parse once up front; everything below derives from this single result
+    # instead of re-running the first pass over the whole script.
     result = parse_screenplay(script, title)
-    
+
     if verbose:
+        scenes = result['screenplay']['scenes']
+        print(f"\nFound {len(scenes)} scene headings")
+        for scene in scenes:
+            print(f"Scene {scene['scene_number']}: {scene['raw_heading']}")
+
+        # The rejected-cue trace is the one thing the parse result can't
+        # provide. The scan below reuses the lru-cached is_character_name,
+        # so every call on a line the parser already saw is a cache hit.
+        rejected_characters = []
+        for i, line in enumerate(script.split("\n")):
+            stripped = line.strip()
+            if not stripped or not (stripped[0].isupper() or stripped[0] == "("):
+                continue
+            if is_character_name(stripped):
+                continue
+            clean_name = _strip_parens(stripped).strip()
+            if (CHAR_RE.match(clean_name)
+                    and len(clean_name.split()) <= 5 and len(clean_name) <= 40):
+                print(f"Line {i+1}: Rejected as character: {stripped}")
+                rejected_characters.append((i+1, stripped))
+
+        print(f"Found {len(result['screenplay']['all_characters'])} dialogue characters")
+        print(f"Rejected {len(rejected_characters)} false character cues")
+
         print(f"\nParsed {len(result['screenplay']['scenes'])} scenes")
         print(f"Parsed {len(result['screenplay']['all_characters'])} characters")
         
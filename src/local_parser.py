@@ -1,15 +1,83 @@
-import json
-import pdfplumber
-from format_parsers import parse_screenplay
+import hashlib
+import multiprocessing
+import os
+try:
+    import fitz  # PyMuPDF - far faster than pdfplumber for plain text
+except ImportError:
+    fitz = None
+from format_parsers import parse_screenplay, screenplay_to_json
+
+# Below this page count, spinning up worker processes costs more than
+# the parallel extraction saves.
+_PARALLEL_PAGE_THRESHOLD = 8
+
+def _extract_page_range(args):
+    """Worker: reopen the PDF in the child and extract a page range."""
+    pdf_path, start, stop = args
+    doc = fitz.open(pdf_path)
+    try:
+        return "\n".join(doc.load_page(i).get_text() for i in range(start, stop))
+    finally:
+        doc.close()
+
+# Extracted text is cached on disk keyed by content hash: screenwriters
+# re-run the parser on the same draft over and over, and a cache hit turns
+# minutes of extraction into one file read.
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "slate-script-parser")
+
+def _cache_path(pdf_path):
+    # hashlib.file_digest streams the file through the C digest without
+    # loading it into memory
+    with open(pdf_path, "rb") as f:
+        return os.path.join(_CACHE_DIR, hashlib.file_digest(f, "sha1").hexdigest() + ".txt")
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from a PDF file."""
-    with pdfplumber.open(pdf_path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
+    """Extract text from a PDF file, cached by content hash."""
+    cache_file = _cache_path(pdf_path)
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        pass
+    text = _extract_text(pdf_path)
+    # Caching is best-effort; extraction already succeeded
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(cache_file, "w", encoding="utf-8") as f:
+            f.write(text)
+    except OSError:
+        pass
     return text
 
+def _extract_text(pdf_path):
+    """Run the actual extraction, page-parallel for long scripts."""
+    if fitz is not None:
+        doc = fitz.open(pdf_path)
+        try:
+            page_count = doc.page_count
+            if page_count < _PARALLEL_PAGE_THRESHOLD:
+                return "\n".join(page.get_text() for page in doc) + "\n"
+        finally:
+            doc.close()
+
+        # Page extraction is embarrassingly parallel, but open documents
+        # don't survive the fork - each worker reopens the file and walks
+        # one contiguous page range.
+        workers = os.cpu_count() or 1
+        chunk = -(-page_count // workers)  # ceil division
+        ranges = [(pdf_path, start, min(start + chunk, page_count))
+                  for start in range(0, page_count, chunk)]
+        with multiprocessing.Pool(len(ranges)) as pool:
+            return "\n".join(pool.map(_extract_page_range, ranges)) + "\n"
+
+    # Fallback: pdfplumber's layout analysis is 10-100x slower but pure Python
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        # Collect pages and join once; += rebuilds the whole string per page.
+        # extract_text() returns None for image-only pages.
+        parts = [page.extract_text() or "" for page in pdf.pages]
+    return "\n".join(parts) + "\n"
+
 def test_parser(pdf_path, output_json_path=None):
     """Test the screenplay parser on a PDF file."""
     print(f"Extracting text from: {pdf_path}")
@@ -47,10 +115,9 @@ def test_parser(pdf_path, output_json_path=None):
     for char in sorted_chars[:5]:
         print(f"{char['name']}: {char['total_lines']} lines, appears in {len(char['scene_appearances'])} scenes")
     
-    # Save to JSON if requested
+    # Save to JSON if requested (orjson-backed, with a stdlib fallback)
     if output_json_path:
-        with open(output_json_path, 'w', encoding='utf-8') as f:
-            json.dump(screenplay_data, f, indent=2)
+        screenplay_to_json(screenplay_data, output_json_path)
         print(f"\nFull results saved to: {output_json_path}")
 
 if __name__ == "__main__":
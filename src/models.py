@@ -4,9 +4,10 @@ from typing import List, Optional
 from datetime import timedelta
 
 class SceneType(Enum):
-    INTERIOR = "INT"
-    EXTERIOR = "EXT"
-    INTERIOR_EXTERIOR = "INT/EXT"
+    # Values match the "type" strings parse_screenplay puts in its JSON
+    INTERIOR = "INTERIOR"
+    EXTERIOR = "EXTERIOR"
+    INTERIOR_EXTERIOR = "INTERIOR_EXTERIOR"
     UNKNOWN = "UNKNOWN"
 
 class TimeOfDay(Enum):
@@ -23,13 +24,13 @@ class TimeOfDay(Enum):
     SAME_TIME = "SAME_TIME"
     UNKNOWN = "UNKNOWN"
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     name: str
     scene_appearances: List[int] = field(default_factory=list)
     total_lines: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Scene:
     id: int
     title: str
@@ -41,11 +42,10 @@ class Scene:
     page_count: float = 0.0
     start_page: float = 0.0  # Page number where scene starts
     end_page: float = 0.0    # Page number where scene ends
-    raw_text: str = ""
     description: str = ""  # New field for scene description
     estimated_duration: timedelta = field(default_factory=lambda: timedelta())
 
-@dataclass
+@dataclass(slots=True)
 class ParsedScript:
     title: str
     format_type: str = "standard"